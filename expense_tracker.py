@@ -1,19 +1,126 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from datetime import datetime, timedelta
 import json
 import os
+import functools
 from abc import ABC, abstractmethod
-import seaborn as sns
-from typing import List, Dict, Optional
+from numba import get_num_threads, njit, prange
+from typing import Any, List, Dict, Tuple
 
-# Set style for better visualizations
-plt.style.use('seaborn-v0_8')
-sns.set_palette("husl")
+_style_applied = False
+
+def _pyplot():
+    """Import matplotlib on first use and apply the plot style once"""
+    global _style_applied
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    if not _style_applied:
+        # Set style for better visualizations
+        plt.style.use('seaborn-v0_8')
+        sns.set_palette("husl")
+        _style_applied = True
+    return plt
+
+@njit(cache=True, fastmath=True)
+def _zscore_mask(amounts, means, stds, threshold, out_idx, out_z):
+    """Write indices and Z-scores of rows exceeding threshold, return their count"""
+    k = 0
+    for i in range(amounts.shape[0]):
+        s = stds[i]
+        if s > 0.0:
+            z = (amounts[i] - means[i]) / s
+            if abs(z) > threshold:
+                out_idx[k] = i
+                out_z[k] = z
+                k += 1
+    return k
+
+@njit(parallel=True, cache=True)
+def _category_sum_count(cats, amounts, n_cats, n_chunks):
+    """Sum amounts and count non-NaN and total rows per category code in one parallel pass"""
+    n = cats.shape[0]
+    chunk = (n + n_chunks - 1) // n_chunks
+    # Each chunk accumulates into its own row, so threads never write the same slot.
+    # Sums are Kahan-compensated like pandas' groupby, so rounded means agree with it
+    sums = np.zeros((n_chunks, n_cats))
+    comps = np.zeros((n_chunks, n_cats))
+    counts = np.zeros((n_chunks, n_cats), dtype=np.int64)
+    rows = np.zeros((n_chunks, n_cats), dtype=np.int64)
+    for c in prange(n_chunks):
+        for i in range(c * chunk, min((c + 1) * chunk, n)):
+            ci = cats[i]
+            if ci < 0:  # Code -1 marks a missing category
+                continue
+            rows[c, ci] += 1
+            x = amounts[i]
+            if x != x:  # Skip NaN amounts, as pandas does (safe here: no fastmath)
+                continue
+            y = x - comps[c, ci]
+            t = sums[c, ci] + y
+            comps[c, ci] = (t - sums[c, ci]) - y
+            sums[c, ci] = t
+            counts[c, ci] += 1
+    total = np.zeros(n_cats)
+    comp = np.zeros(n_cats)
+    for c in range(n_chunks):
+        for k in range(n_cats):
+            y = (sums[c, k] - comps[c, k]) - comp[k]
+            t = total[k] + y
+            comp[k] = (t - total[k]) - y
+            total[k] = t
+    return total, counts.sum(axis=0), rows.sum(axis=0)
+
+@njit(cache=True, fastmath=True)
+def _daily_sums(day_ord, amounts, n_days):
+    """Histogram amounts into a dense array indexed by day offset"""
+    daily = np.zeros(n_days)
+    for i in range(day_ord.shape[0]):
+        daily[day_ord[i]] += amounts[i]
+    return daily
+
+@njit(cache=True)
+def _rolling_mean(daily, window):
+    """Trailing mean over window days via a running sum, NaN until the window fills"""
+    # Mirrors pandas' rolling mean: Kahan-compensated (so no fastmath, which would
+    # reassociate the compensation away), exact for windows of one repeated value
+    # such as idle days, and clamped at 0 for windows with no negative values
+    out = np.empty(daily.shape[0])
+    csum = 0.0
+    comp = 0.0
+    n_negative = 0
+    run = 0  # Length of the current run of equal values ending at i
+    for i in range(daily.shape[0]):
+        run = run + 1 if i > 0 and daily[i] == daily[i - 1] else 1
+        y = daily[i] - comp
+        t = csum + y
+        comp = (t - csum) - y
+        csum = t
+        n_negative += daily[i] < 0
+        if i >= window:
+            y = -daily[i - window] - comp
+            t = csum + y
+            comp = (t - csum) - y
+            csum = t
+            n_negative -= daily[i - window] < 0
+        if i < window - 1:
+            out[i] = np.nan
+        elif run >= window:
+            out[i] = daily[i]
+        elif n_negative == 0 and csum < 0:
+            out[i] = 0.0
+        else:
+            out[i] = csum / window
+    return out
 
 class DataStorage(ABC):
     """Abstract base class for data storage"""
+    DTYPES = {'amount': 'float64', 'category': 'category', 'description': 'string'}
+    
+    def empty_data(self) -> pd.DataFrame:
+        """Create an empty expense DataFrame with the expected dtypes"""
+        data = pd.DataFrame(columns=['date', 'category', 'amount', 'description'])
+        return data.astype({'date': 'datetime64[ns]', **self.DTYPES})
+    
     @abstractmethod
     def save_data(self, data: pd.DataFrame):
         pass
@@ -21,58 +128,194 @@ class DataStorage(ABC):
     @abstractmethod
     def load_data(self) -> pd.DataFrame:
         pass
+    
+    @abstractmethod
+    def append_record(self, record: Dict):
+        pass
 
 class JSONDataStorage(DataStorage):
-    """JSON-based data storage implementation"""
+    """JSON Lines based data storage implementation (one expense per line)"""
     def __init__(self, filename: str = "expenses_data.json"):
+        self.filename = filename  # Legacy pretty-printed JSON, read for migration only
+        self.filename_jsonl = os.path.splitext(filename)[0] + ".jsonl"
+    
+    def save_data(self, data: pd.DataFrame):
+        """Save DataFrame to JSON Lines file"""
+        data.to_json(self.filename_jsonl, orient='records', lines=True, date_format='iso')
+    
+    def load_data(self) -> pd.DataFrame:
+        """Load DataFrame from JSON Lines file, falling back to legacy JSON"""
+        if os.path.exists(self.filename_jsonl):
+            return pd.read_json(self.filename_jsonl, lines=True, dtype=self.DTYPES,
+                                convert_dates=['date'])
+        if os.path.exists(self.filename):
+            return pd.read_json(self.filename, orient='records').astype(self.DTYPES)
+        return self.empty_data()
+    
+    def append_record(self, record: Dict):
+        """Append a single record without rewriting existing data"""
+        if not os.path.exists(self.filename_jsonl) and os.path.exists(self.filename):
+            self.save_data(self.load_data())  # Migrate legacy JSON before appending
+        with open(self.filename_jsonl, 'a') as f:
+            f.write(json.dumps(record, default=str) + '\n')
+
+class ParquetDataStorage(DataStorage):
+    """Parquet-based data storage implementation (columnar, typed, compressed)"""
+    def __init__(self, filename: str = "expenses_data.parquet"):
         self.filename = filename
     
     def save_data(self, data: pd.DataFrame):
-        """Save DataFrame to JSON file"""
-        data.to_json(self.filename, orient='records', indent=2)
+        """Save DataFrame to Parquet file"""
+        data.to_parquet(self.filename, engine='pyarrow', compression='zstd', index=False)
     
     def load_data(self) -> pd.DataFrame:
-        """Load DataFrame from JSON file"""
+        """Load DataFrame from Parquet file"""
         if os.path.exists(self.filename):
-            return pd.read_json(self.filename, orient='records')
-        return pd.DataFrame(columns=['date', 'category', 'amount', 'description'])
+            return pd.read_parquet(self.filename, engine='pyarrow')
+        return self.empty_data()
+    
+    def append_record(self, record: Dict):
+        """Append a single record (Parquet files are immutable, so this rewrites)"""
+        data = pd.concat([self.load_data(), pd.DataFrame([record]).astype(self.DTYPES)],
+                         ignore_index=True)
+        data['category'] = data['category'].astype('category')
+        self.save_data(data)
+
+def _memoized(method):
+    """Cache an ExpenseAnalyzer method's result until the analyzer's data version changes"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        version, result = self._cache.get(key, (-1, None))
+        if version != self._version:
+            result = method(self, *args, **kwargs)
+            self._cache[key] = (self._version, result)
+        # Hand out copies so callers can't mutate the cached frame
+        if isinstance(result, (pd.DataFrame, pd.Series)):
+            return result.copy()
+        return result
+    return wrapper
 
 class ExpenseAnalyzer:
     """Class for analyzing expense data"""
     def __init__(self, data: pd.DataFrame):
+        self._version = 0
+        self._cache: Dict[tuple, Tuple[int, Any]] = {}
+        self.update(data)
+    
+    def update(self, data: pd.DataFrame):
+        """Point the analyzer at a new snapshot of expense data"""
         self.data = data
-        self.data['date'] = pd.to_datetime(self.data['date'])
+        self._version += 1  # Invalidates all memoized results
+        if not pd.api.types.is_datetime64_any_dtype(self.data['date']):
+            self.data['date'] = pd.to_datetime(self.data['date'], cache=True)
+        # Concats can leave the hot amount column strided; groupby-sums want it contiguous
+        if not self.data['amount'].to_numpy().flags.c_contiguous:
+            self.data['amount'] = np.ascontiguousarray(self.data['amount'].to_numpy())
+        # Integer year*12 + (month-1) key, so monthly groupbys avoid Period objects;
+        # rows without a date (NaT) are left out, as a Period groupby would drop them
+        self._has_date = self.data['date'].notna().to_numpy()
+        dates = self.data['date'][self._has_date].dt
+        self._month_key = (dates.year.to_numpy(dtype=np.int32) * 12
+                           + dates.month.to_numpy(dtype=np.int32) - 1)
+        # Struct-of-arrays view of the hot columns, with categories as integer codes
+        self._dates = self.data['date'].to_numpy()
+        self._day_ord = self._dates.astype('datetime64[D]').view(np.int64)
+        self._amounts = self.data['amount'].to_numpy(dtype=np.float64)
+        category = self.data['category']
+        if isinstance(category.dtype, pd.CategoricalDtype):
+            self._cats = category.cat.codes.to_numpy(dtype=np.int32)
+            self._cat_names = category.cat.categories.to_numpy()
+        else:
+            codes, names = pd.factorize(category, sort=True)
+            self._cats, self._cat_names = codes.astype(np.int32), np.asarray(names)
     
+    @_memoized
     def get_category_summary(self) -> pd.DataFrame:
         """Get summary of expenses by category"""
-        return self.data.groupby('category')['amount'].agg(['sum', 'count', 'mean']).round(2)
+        sums, counts, rows = _category_sum_count(self._cats, self._amounts,
+                                                 len(self._cat_names), get_num_threads())
+        # A category whose amounts are all NaN is still listed, with a NaN mean
+        observed = rows > 0
+        sums, counts = sums[observed], counts[observed]
+        means = np.full(len(sums), np.nan)
+        np.divide(sums, counts, out=means, where=counts > 0)
+        return pd.DataFrame({
+            'sum': sums,
+            'count': counts,
+            'mean': means
+        }, index=pd.Index(self._cat_names[observed], name='category')).round(2)
     
+    @_memoized
     def get_monthly_summary(self) -> pd.DataFrame:
         """Get monthly expense summary"""
-        monthly_data = self.data.copy()
-        monthly_data['month'] = monthly_data['date'].dt.to_period('M')
-        return monthly_data.groupby('month')['amount'].agg(['sum', 'count']).round(2)
+        amounts = self.data['amount'][self._has_date]
+        summary = amounts.groupby(self._month_key).agg(['sum', 'count']).round(2)
+        keys = summary.index.to_numpy()
+        months = pd.to_datetime(pd.DataFrame({'year': keys // 12, 'month': keys % 12 + 1, 'day': 1}))
+        summary.index = pd.PeriodIndex(months.dt.to_period('M'), name='month')
+        return summary
+    
+    @_memoized
+    def _daily_totals(self) -> pd.Series:
+        """Get total spent per calendar day"""
+        # Dated rows span the range; NaN amounts are dropped before the fastmath kernel
+        day_ord, amounts = self._day_ord[self._has_date], self._amounts[self._has_date]
+        first_day = day_ord.min() if len(day_ord) else 0
+        day_ord = day_ord - first_day
+        n_days = int(day_ord.max()) + 1 if len(day_ord) else 0
+        index = pd.date_range(pd.Timestamp(first_day, unit='D'), periods=n_days,
+                              freq='D', name='date')
+        known = ~np.isnan(amounts)
+        daily = _daily_sums(day_ord[known], amounts[known], n_days)
+        return pd.Series(daily, index=index, name='amount')
     
+    @_memoized
+    def get_average_daily(self) -> float:
+        """Get average spent per day that has at least one expense"""
+        # Like the per-date groupby: undated rows are dropped, and a day whose amounts
+        # are all NaN still counts, with a total of 0
+        day_ord = self._day_ord[self._has_date]
+        if not len(day_ord):
+            return float('nan')
+        active_days = np.count_nonzero(np.bincount(day_ord - day_ord.min()))
+        return np.nansum(self._amounts[self._has_date]) / active_days
+    
+    @_memoized
     def get_spending_trend(self, window: int = 7) -> pd.DataFrame:
         """Calculate rolling spending trend"""
-        daily_data = self.data.set_index('date').resample('D')['amount'].sum().fillna(0)
-        return daily_data.rolling(window=window).mean()
+        if window < 0:
+            raise ValueError("window must be an integer 0 or greater")
+        daily_totals = self._daily_totals()
+        if window == 0:  # An empty window has no mean, as with pandas' rolling(0)
+            trend = np.full(len(daily_totals), np.nan)
+        else:
+            trend = _rolling_mean(daily_totals.to_numpy(), window)
+        return pd.Series(trend, index=daily_totals.index, name=daily_totals.name)
     
+    @_memoized
     def detect_anomalies(self, threshold: float = 2.0) -> pd.DataFrame:
         """Detect anomalous spending patterns using Z-score"""
-        category_means = self.data.groupby('category')['amount'].mean()
-        category_stds = self.data.groupby('category')['amount'].std()
+        stats = self.data.groupby('category', sort=False, observed=True)['amount'].agg(['mean', 'std'])
+        joined = self.data[['category']].join(stats, on='category')
+        category_means = joined['mean'].to_numpy(dtype='float64')
+        category_stds = joined['std'].to_numpy(dtype='float64')
+        amounts = self._amounts
         
-        anomalies = []
-        for _, row in self.data.iterrows():
-            category = row['category']
-            amount = row['amount']
-            if category in category_means and category in category_stds:
-                z_score = (amount - category_means[category]) / category_stds[category]
-                if abs(z_score) > threshold:
-                    anomalies.append({**row.to_dict(), 'z_score': z_score})
-        
-        return pd.DataFrame(anomalies)
+        # Categories with a single expense have a NaN std; zero it out so the kernel
+        # skips them like constant-amount categories. NaN amounts are skipped the same
+        # way, and no NaN reaches the kernel at all, since fastmath assumes there are none
+        unknown = np.isnan(amounts) | np.isnan(category_means)
+        category_stds = np.where(unknown, 0.0, np.nan_to_num(category_stds, nan=0.0))
+        category_means = np.where(unknown, 0.0, category_means)
+        amounts = np.where(unknown, 0.0, amounts)
+        out_idx = np.empty(len(amounts), dtype=np.int64)
+        out_z = np.empty(len(amounts), dtype=np.float64)
+        k = _zscore_mask(amounts, category_means, category_stds, float(threshold), out_idx, out_z)
+        # Gather the flagged rows column-wise rather than building a dict per row
+        result = self.data[['date', 'category', 'amount', 'description']].iloc[out_idx[:k]].copy()
+        result['z_score'] = out_z[:k]
+        return result
 
 class BudgetManager:
     """Class for managing budgets and alerts"""
@@ -85,21 +328,34 @@ class BudgetManager:
     
     def check_budget_violations(self, expenses: pd.DataFrame) -> Dict:
         """Check for budget violations"""
-        current_month = datetime.now().strftime('%Y-%m')
-        monthly_expenses = expenses[expenses['date'].dt.strftime('%Y-%m') == current_month]
+        month_start = pd.Timestamp.now().normalize().replace(day=1)
+        dates = expenses['date']
+        if dates.is_monotonic_increasing:
+            # Expenses are appended in time order, so the month is a contiguous slice
+            month_end = month_start + pd.offsets.MonthBegin(1)
+            start, end = dates.searchsorted([month_start, month_end])
+            monthly_expenses = expenses.iloc[start:end]
+        else:
+            mask = ((dates.dt.year.to_numpy() == month_start.year)
+                    & (dates.dt.month.to_numpy() == month_start.month))
+            monthly_expenses = expenses[mask]
+        totals = monthly_expenses.groupby('category', sort=False, observed=True)['amount'].sum()
+        
+        limits = pd.Series(self.budgets, dtype='float64')
+        spent = totals.reindex(limits.index, fill_value=0.0).astype('float64')
+        over_budget = (spent > limits).to_numpy()
+        near_budget = ~over_budget & (spent > limits * 0.8).to_numpy()  # 80% threshold warning
         
         violations = {}
-        for category, limit in self.budgets.items():
-            category_expenses = monthly_expenses[monthly_expenses['category'] == category]
-            total_spent = category_expenses['amount'].sum()
-            
+        for category in limits.index[over_budget | near_budget]:
+            limit, total_spent = self.budgets[category], spent[category]
             if total_spent > limit:
                 violations[category] = {
                     'limit': limit,
                     'spent': total_spent,
                     'overspend': total_spent - limit
                 }
-            elif total_spent > limit * 0.8:  # 80% threshold warning
+            else:
                 violations[category] = {
                     'limit': limit,
                     'spent': total_spent,
@@ -113,6 +369,7 @@ class ExpenseVisualizer:
     @staticmethod
     def plot_category_distribution(analyzer: ExpenseAnalyzer):
         """Plot pie chart of expenses by category"""
+        plt = _pyplot()
         category_summary = analyzer.get_category_summary()
         plt.figure(figsize=(10, 8))
         plt.pie(category_summary['sum'], labels=category_summary.index, autopct='%1.1f%%')
@@ -122,6 +379,7 @@ class ExpenseVisualizer:
     @staticmethod
     def plot_monthly_trends(analyzer: ExpenseAnalyzer):
         """Plot monthly spending trends"""
+        plt = _pyplot()
         monthly_data = analyzer.get_monthly_summary()
         plt.figure(figsize=(12, 6))
         monthly_data['sum'].plot(kind='bar')
@@ -135,6 +393,7 @@ class ExpenseVisualizer:
     @staticmethod
     def plot_spending_trend(analyzer: ExpenseAnalyzer, window: int = 7):
         """Plot rolling spending trend"""
+        plt = _pyplot()
         trend_data = analyzer.get_spending_trend(window)
         plt.figure(figsize=(12, 6))
         trend_data.plot()
@@ -149,29 +408,50 @@ class ExpenseTracker:
     def __init__(self, storage: DataStorage = None):
         self.storage = storage or JSONDataStorage()
         self.data = self.storage.load_data()
+        self.data['category'] = self.data['category'].astype('category')
+        self._pending: List[Dict] = []  # Expenses not yet merged into self.data
         self.analyzer = ExpenseAnalyzer(self.data)
         self.budget_manager = BudgetManager()
         self.visualizer = ExpenseVisualizer()
     
     def add_expense(self, category: str, amount: float, description: str = ""):
         """Add a new expense"""
-        new_expense = pd.DataFrame([{
-            'date': datetime.now(),
+        new_expense = {
+            'date': pd.Timestamp.now(),
             'category': category,
             'amount': amount,
             'description': description
-        }])
+        }
         
-        self.data = pd.concat([self.data, new_expense], ignore_index=True)
-        self.storage.save_data(self.data)
-        self.analyzer = ExpenseAnalyzer(self.data)  # Refresh analyzer
+        self._pending.append(new_expense)
+        self.storage.append_record(new_expense)
         
         print("Expense added successfully!")
         self.check_budgets()
     
+    def _flush(self):
+        """Merge pending expenses into the DataFrame in a single concat"""
+        if not self._pending:
+            return
+        new_expenses = pd.DataFrame(self._pending)
+        # Widen the categories so the concat keeps the column categorical
+        categories = self.data['category'].cat.categories.union(new_expenses['category'].unique())
+        dtypes = {**self.data.dtypes.to_dict(), 'category': pd.CategoricalDtype(categories)}
+        self.data = pd.concat([self.data.astype({'category': dtypes['category']}),
+                               new_expenses.astype(dtypes)], ignore_index=True)
+        self._pending = []
+        self.analyzer.update(self.data)
+    
+    def _current(self) -> pd.DataFrame:
+        """Return the expense data including any pending expenses"""
+        self._flush()
+        return self.data
+    
     def check_budgets(self):
         """Check and display budget violations"""
-        violations = self.budget_manager.check_budget_violations(self.data)
+        if not self.budget_manager.budgets:
+            return
+        violations = self.budget_manager.check_budget_violations(self._current())
         if violations:
             print("\n⚠️  Budget Alerts:")
             for category, info in violations.items():
@@ -182,6 +462,7 @@ class ExpenseTracker:
     
     def view_summary(self, period: str = 'month'):
         """View expense summary"""
+        data = self._current()
         if period == 'month':
             summary = self.analyzer.get_monthly_summary()
             print("\n📊 Monthly Summary:")
@@ -191,13 +472,14 @@ class ExpenseTracker:
             print("\n📊 Category Summary:")
             print(summary)
         
-        total_spent = self.data['amount'].sum()
-        avg_daily = self.data.groupby(self.data['date'].dt.date)['amount'].sum().mean()
+        total_spent = data['amount'].sum()
+        avg_daily = self.analyzer.get_average_daily()
         print(f"\n💰 Total Spent: ₹{total_spent:.2f}")
         print(f"📅 Average Daily: ₹{avg_daily:.2f}")
     
     def view_anomalies(self):
         """View spending anomalies"""
+        self._flush()
         anomalies = self.analyzer.detect_anomalies()
         if not anomalies.empty:
             print("\n🔍 Spending Anomalies Detected:")
@@ -223,6 +505,7 @@ class ExpenseTracker:
         print("3. Spending Trend")
         
         choice = input("Choose option (1-3): ")
+        self._flush()
         if choice == "1":
             self.visualizer.plot_category_distribution(self.analyzer)
         elif choice == "2":
@@ -233,7 +516,7 @@ class ExpenseTracker:
     
     def export_report(self, filename: str = "expense_report.csv"):
         """Export data to CSV"""
-        self.data.to_csv(filename, index=False)
+        self._current().to_csv(filename, index=False)
         print(f"Report exported to {filename}")
 
 def main():